@@ -1,6 +1,7 @@
 import logging
+import os
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -16,6 +17,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger("notification_preferences_api")
 
+def resolve_log_level(value: str, default: int = logging.WARNING) -> int:
+    """
+    Resolve a log level name (case-insensitive) to its numeric level.
+    Args:
+        value (str): Level name, e.g. 'WARNING' or 'debug'.
+        default (int): Level used when the name is unknown.
+    Returns:
+        int: Numeric log level.
+    """
+    level = logging.getLevelName(value.strip().upper())
+    if isinstance(level, int):
+        return level
+    logger.warning(f"Unknown log level {value!r}, using {logging.getLevelName(default)}")
+    return default
+
+# Per-request auth failures are logged at DEBUG with periodic WARNING summaries;
+# keep the auth logger at WARNING unless explicitly overridden
+logging.getLogger("notification_preferences_api.auth").setLevel(
+    resolve_log_level(os.getenv("AUTH_LOG_LEVEL", "WARNING"))
+)
+
+# Health check body, serialized once (liveness probes hit this constantly)
+_HEALTH_BODY = b'{"status":"ok"}'
+
 def create_app() -> FastAPI:
     """
     Create and configure FastAPI application.
@@ -28,11 +53,17 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
-        openapi_url="/openapi.json"
+        openapi_url="/openapi.json",
+        # Routes register both slash forms explicitly; avoid 307 redirect round-trips
+        redirect_slashes=False,
+        # Serialize all responses with orjson instead of the stdlib json module
+        default_response_class=ORJSONResponse
     )
 
-    # Enforce HTTPS in production (remove/comment for local dev if needed)
-    app.add_middleware(HTTPSRedirectMiddleware)
+    # TLS is expected to be terminated (and HTTP redirected) at the ingress/reverse proxy.
+    # Set ENFORCE_HTTPS=1 to redirect in-app when the service is exposed directly.
+    if os.getenv("ENFORCE_HTTPS") == "1":
+        app.add_middleware(HTTPSRedirectMiddleware)
 
     # CORS configuration (adjust origins as needed)
     app.add_middleware(
@@ -53,7 +84,7 @@ def create_app() -> FastAPI:
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         logger.warning(f"HTTPException: {exc.detail} (status: {exc.status_code})")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail}
         )
@@ -61,7 +92,7 @@ def create_app() -> FastAPI:
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         logger.error(f"Validation error: {exc.errors()}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content={"detail": "Invalid request data.", "errors": exc.errors()}
         )
@@ -69,22 +100,23 @@ def create_app() -> FastAPI:
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
         logger.exception("Unhandled exception occurred")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"detail": "Internal server error. Please try again later."}
         )
 
     @app.get("/health", tags=["Health"])
-    async def health_check():
+    async def health_check() -> Response:
         """
         Health check endpoint.
         Returns:
-            dict: Health status.
+            Response: Precomputed JSON health status.
         """
-        return {"status": "ok"}
+        return Response(content=_HEALTH_BODY, media_type="application/json")
 
     return app
 
+# Run with: uvicorn backend.main:app --loop uvloop --http httptools (see backend/Dockerfile)
 app = create_app()
 
 # Exported: FastAPI app instance
\ No newline at end of file
@@ -1,14 +1,16 @@
-from typing import Optional, Dict, Any
+from typing import Dict, Any
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp, Receive, Scope, Send
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi import Depends, HTTPException
 
+import asyncio
+import hashlib
 import logging
+import time
 import jwt  # PyJWT (latest stable)
 import os
+import orjson
+from cachetools import TTLCache
+from collections import Counter
 
 logger = logging.getLogger("notification_preferences_api.auth")
 
@@ -16,71 +18,147 @@ logger = logging.getLogger("notification_preferences_api.auth")
 JWT_SECRET = os.getenv("JWT_SECRET", "change_this_secret")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
-class AuthMiddleware(BaseHTTPMiddleware):
+# Path prefixes served without authentication (health and docs endpoints)
+WHITELIST_PREFIXES = ("/health", "/docs", "/openapi.json", "/redoc")
+
+# Cache of verified JWT payloads keyed by SHA-256 of the raw token.
+# Entries live at most JWT_CACHE_TTL seconds and never past the token's own "exp".
+JWT_CACHE_TTL = 60
+_jwt_cache: TTLCache = TTLCache(maxsize=10000, ttl=JWT_CACHE_TTL)
+
+async def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Decode and verify a JWT, reusing a previously verified payload when possible.
+    Only successfully verified tokens are cached. On a cache miss, signature
+    verification runs in a worker thread so it does not block the event loop.
+    Args:
+        token (str): Raw JWT from the Authorization header.
+    Returns:
+        dict: Verified token payload.
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid or expired.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _jwt_cache.get(key)
+    if payload is not None:
+        exp = payload.get("exp")
+        if exp is None or exp > time.time():
+            return payload
+        # Token expired while cached; fall through so jwt.decode reports it
+        _jwt_cache.pop(key, None)
+
+    payload = await asyncio.to_thread(jwt.decode, token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    # The exp check above caps each entry's lifetime at min(JWT_CACHE_TTL, exp - now)
+    _jwt_cache[key] = payload
+    return payload
+
+# Auth failures are counted and summarized instead of logged one by one, so a
+# credential-stuffing burst cannot flood the logs. A summary is emitted on the failure
+# that reaches AUTH_FAILURE_LOG_EVERY, or on the first failure arriving at least
+# AUTH_FAILURE_LOG_INTERVAL seconds after the last summary. There is no background
+# flush: counts pending when failures stop are reported with the next failure.
+AUTH_FAILURE_LOG_EVERY = int(os.getenv("AUTH_FAILURE_LOG_EVERY", "100"))
+AUTH_FAILURE_LOG_INTERVAL = float(os.getenv("AUTH_FAILURE_LOG_INTERVAL", "60"))
+_auth_failures: Counter = Counter()
+_last_auth_failure_summary = time.monotonic()
+
+def _record_auth_failure(reason: str) -> None:
+    """
+    Count an authentication failure. Logs a summary when this failure brings the count
+    to AUTH_FAILURE_LOG_EVERY, or when it arrives AUTH_FAILURE_LOG_INTERVAL seconds or
+    more after the last summary.
+    Args:
+        reason (str): Failure category ('missing', 'expired', 'invalid').
+    """
+    global _last_auth_failure_summary
+    logger.debug("Authentication failed: %s", reason)
+    _auth_failures[reason] += 1
+    now = time.monotonic()
+    if _auth_failures.total() >= AUTH_FAILURE_LOG_EVERY or \
+       now - _last_auth_failure_summary >= AUTH_FAILURE_LOG_INTERVAL:
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "%d authentication failures: %s",
+                _auth_failures.total(),
+                ", ".join(f"{k}={v}" for k, v in sorted(_auth_failures.items()))
+            )
+        _auth_failures.clear()
+        _last_auth_failure_summary = now
+
+# Precomputed 401 response bodies, sent without building Response objects
+_UNAUTHORIZED_BODIES: Dict[str, bytes] = {
+    "missing": orjson.dumps({"detail": "Authentication required. Please log in."}),
+    "expired": orjson.dumps({"detail": "Session expired. Please log in again."}),
+    "invalid": orjson.dumps({"detail": "Invalid authentication token."}),
+    "error": orjson.dumps({"detail": "Authentication failed. Please log in."}),
+}
+
+class AuthMiddleware:
     """
-    FastAPI middleware to enforce authentication on protected endpoints.
+    Pure ASGI middleware to enforce authentication on protected endpoints.
     Only allows requests with valid JWT Bearer tokens.
     """
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.bearer = HTTPBearer(auto_error=False)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-    async def dispatch(self, request: Request, call_next):
         # Allow unauthenticated access to health and docs endpoints
-        if request.url.path.startswith("/health") or \
-           request.url.path.startswith("/docs") or \
-           request.url.path.startswith("/openapi.json") or \
-           request.url.path.startswith("/redoc"):
-            return await call_next(request)
-
-        credentials: Optional[HTTPAuthorizationCredentials] = await self.bearer(request)
-        if credentials is None or credentials.scheme.lower() != "bearer":
-            logger.info("Missing or invalid authentication credentials")
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Authentication required. Please log in."}
-            )
+        if scope["path"].startswith(WHITELIST_PREFIXES):
+            return await self.app(scope, receive, send)
+
+        # ASGI header names are lowercased bytes; scan them directly
+        auth = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth = value
+                break
+        # Auth scheme is case-insensitive (RFC 7235)
+        if not auth or auth[:7].lower() != b"bearer " or len(auth) == 7:
+            _record_auth_failure("missing")
+            return await self._unauthorized(send, "missing")
+        token = auth[7:].decode("latin-1")
 
-        token = credentials.credentials
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            # Attach user info to request state for downstream usage
-            request.state.user = payload
+            payload = await decode_token(token)
         except jwt.ExpiredSignatureError:
-            logger.info("Expired JWT token")
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Session expired. Please log in again."}
-            )
+            _record_auth_failure("expired")
+            return await self._unauthorized(send, "expired")
         except jwt.InvalidTokenError:
-            logger.info("Invalid JWT token")
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Invalid authentication token."}
-            )
+            _record_auth_failure("invalid")
+            return await self._unauthorized(send, "invalid")
         except Exception as e:
             logger.exception("Unhandled authentication error")
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Authentication failed. Please log in."}
-            )
+            return await self._unauthorized(send, "error")
+
+        # Attach user info to request state for downstream usage
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
 
-        return await call_next(request)
+    @staticmethod
+    async def _unauthorized(send: Send, reason: str) -> None:
+        body = _UNAUTHORIZED_BODIES[reason]
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_401_UNAUTHORIZED,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
 
+# Invariant: AuthMiddleware is the single source of truth for 401s. It runs before
+# routing and sets scope["state"]["user"] for every non-whitelisted request, so
+# the dependency below never needs to re-check or raise.
 def get_current_user(request: Request) -> Dict[str, Any]:
     """
     Dependency to retrieve current authenticated user from request state.
-    Raises HTTPException if user is not authenticated.
     Returns:
-        dict: User payload from JWT.
+        dict: User payload from JWT (set by AuthMiddleware).
     """
-    user = getattr(request.state, "user", None)
-    if not user:
-        logger.info("No authenticated user found in request state")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required. Please log in."
-        )
-    return user
+    return request.scope["state"]["user"]
 
 # Exported: AuthMiddleware, get_current_user
\ No newline at end of file
@@ -20,13 +20,15 @@ class NotificationType(Base):
     Supports localization via JSON field for descriptions.
     """
     __tablename__ = "notification_types"
+    # Declare future relationships (e.g. localizations, user preferences) with
+    # lazy="selectin" so collections load in one IN (...) query, not one per row.
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     key = Column(String(64), unique=True, nullable=False, index=True, doc="Unique key for notification type (e.g., 'email_alert')")
     # Localized descriptions: { "en": "English desc", "fr": "French desc", ... }
     descriptions = Column(JSON, nullable=False, doc="Localized descriptions for notification type")
-    available = Column(Boolean, nullable=False, default=True, index=True, doc="Is this notification type currently available?")
-    deprecated = Column(Boolean, nullable=False, default=False, index=True, doc="Is this notification type deprecated?")
+    available = Column(Boolean, nullable=False, default=True, doc="Is this notification type currently available?")
+    deprecated = Column(Boolean, nullable=False, default=False, doc="Is this notification type deprecated?")
     deprecated_reason = Column(String(256), nullable=True, doc="Reason for deprecation (if deprecated)")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, doc="Creation timestamp")
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False, doc="Last update timestamp")
@@ -39,13 +41,17 @@ class NotificationType(Base):
         Returns:
             str: Localized description if available, else English or empty string.
         """
-        if not self.descriptions:
+        descriptions = self.descriptions
+        if not descriptions:
             return ""
-        return self.descriptions.get(lang) or self.descriptions.get("en") or ""
+        if lang == "en":
+            return descriptions.get("en") or ""
+        return descriptions.get(lang) or descriptions.get("en") or ""
 
     def as_dict(self) -> Dict:
         """
         Serialize the notification type to a dictionary.
+        Timestamps are left as datetime objects; orjson encodes them as ISO 8601.
         Returns:
             dict: Serialized notification type.
         """
@@ -56,11 +62,12 @@ class NotificationType(Base):
             "available": self.available,
             "deprecated": self.deprecated,
             "deprecated_reason": self.deprecated_reason,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
 
-# Indexes for performance on large tables
+# Indexes for performance on large tables (declared here only, not via index=True,
+# so create_all does not emit the same index name twice)
 Index("ix_notification_types_available", NotificationType.available)
 Index("ix_notification_types_deprecated", NotificationType.deprecated)
 
@@ -1,12 +1,14 @@
-from typing import List
 from fastapi import APIRouter, Depends, Query, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
+import orjson
+from cachetools import TTLCache
 
 from backend.models import NotificationType, Base
-from backend.schemas import NotificationTypeOut, NotificationTypeListResponse, ErrorResponse
+from backend.schemas import NotificationTypeListResponse, ErrorResponse
 from backend.middleware.auth import get_current_user
 from backend.routes.dependencies import get_db
 
@@ -14,10 +16,29 @@ router = APIRouter()
 
 logger = logging.getLogger("notification_preferences_api.notifications")
 
+# Process-local cache of serialized list responses: lang -> body.
+# notification_types is near-static config data, so a short TTL is safe.
+# Bounded because `lang` is client-controlled.
+_LIST_TTL = 60.0
+_LIST_CACHE_MAXSIZE = 64
+_LIST_CACHE: TTLCache = TTLCache(maxsize=_LIST_CACHE_MAXSIZE, ttl=_LIST_TTL)
+
+def invalidate_notification_types_cache() -> None:
+    """
+    Drop all cached notification type responses.
+    Call after writing to the notification_types table.
+    """
+    _LIST_CACHE.clear()
+
+# Served at both /api/notifications and /api/notifications/ (the app disables
+# slash redirects, so neither form costs an extra 307 round-trip)
+@router.get("/", include_in_schema=False, response_model=None)
 @router.get(
-    "/",
-    response_model=NotificationTypeListResponse,
+    "",
+    # Rows are serialized directly with orjson; the model is kept for OpenAPI docs only
+    response_model=None,
     responses={
+        200: {"model": NotificationTypeListResponse, "description": "Successful Response"},
         401: {"model": ErrorResponse, "description": "Unauthorized"},
         500: {"model": ErrorResponse, "description": "Internal Server Error"},
     },
@@ -29,49 +50,71 @@ async def get_notification_types(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
     lang: str = Query("en", min_length=2, max_length=5, description="Language code for localization (e.g., 'en', 'fr').")
-) -> NotificationTypeListResponse:
+) -> Response:
     """
     Returns a list of notification types and their descriptions, localized to the user's language.
     Only available types are shown; deprecated types are marked with explanations.
     """
-    try:
-        # Query all notification types, including deprecated for marking
-        notification_types: List[NotificationType] = db.query(NotificationType).all()
+    cached_body = _LIST_CACHE.get(lang)
+    if cached_body is not None:
+        return Response(content=cached_body, media_type="application/json")
 
-        # Filter and annotate types for response
-        result_types: List[NotificationTypeOut] = []
-        for nt in notification_types:
-            # Hide unavailable types
-            if not nt.available:
-                continue
-            # Mark deprecated types with reason
-            nt_out = NotificationTypeOut(
-                id=nt.id,
-                key=nt.key,
-                descriptions=nt.descriptions,
-                available=nt.available,
-                deprecated=nt.deprecated,
-                deprecated_reason=nt.deprecated_reason,
-                created_at=nt.created_at,
-                updated_at=nt.updated_at
+    try:
+        # Query available types only (deprecated ones are kept for marking), sorted by key in SQL.
+        # The localized description (with English fallback) is resolved in SQL, so only
+        # one string per row leaves the database.
+        description_en = NotificationType.descriptions["en"].as_string()
+        if lang == "en":
+            description = func.coalesce(description_en, "")
+        else:
+            description = func.coalesce(
+                func.nullif(NotificationType.descriptions[lang].as_string(), ""),
+                func.nullif(description_en, ""),
+                "",
             )
-            result_types.append(nt_out)
-
-        # Sort for consistent UI (e.g., by key)
-        result_types.sort(key=lambda x: x.key)
+        rows = db.execute(
+            select(
+                NotificationType.id,
+                NotificationType.key,
+                description.label("description"),
+                NotificationType.deprecated,
+                NotificationType.deprecated_reason,
+                NotificationType.created_at,
+                NotificationType.updated_at,
+            )
+            .where(NotificationType.available.is_(True))
+            .order_by(NotificationType.key)
+        ).all()
 
-        return NotificationTypeListResponse(notification_types=result_types)
+        # Plain rows go straight to orjson, skipping ORM and Pydantic per-row construction.
+        # `available` is implied by the filter; `deprecated_reason` is only sent for deprecated types.
+        result_types = []
+        for row in rows:
+            nt_out = {
+                "id": row.id,
+                "key": row.key,
+                "description": row.description,
+                "deprecated": row.deprecated,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+            }
+            if row.deprecated:
+                nt_out["deprecated_reason"] = row.deprecated_reason
+            result_types.append(nt_out)
+        body = orjson.dumps({"notification_types": result_types})
+        _LIST_CACHE[lang] = body
+        return Response(content=body, media_type="application/json")
     except SQLAlchemyError as e:
         logger.error(f"Database error fetching notification types: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=ErrorResponse(detail="Failed to fetch notification types. Please try again later.").dict()
         )
     except Exception as e:
         logger.exception("Unhandled error in get_notification_types")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=ErrorResponse(detail="Internal server error. Please try again later.").dict()
         )
 
-# Exported: router
\ No newline at end of file
+# Exported: router, invalidate_notification_types_cache
\ No newline at end of file
@@ -1,28 +1,23 @@
-from typing import Dict, Optional, List
+from typing import Optional, List
 from datetime import datetime
 from pydantic import BaseModel, Field
 
-class NotificationTypeBase(BaseModel):
+class NotificationTypeOutActive(BaseModel):
     """
-    Base schema for NotificationType.
+    Slim output schema for available notification types (list endpoint).
+    Omits `available` (always true) and omits `deprecated_reason` unless deprecated.
     """
+    id: int = Field(..., description="Unique identifier for notification type.")
     key: str = Field(..., description="Unique key for notification type (e.g., 'email_alert').")
-    descriptions: Dict[str, str] = Field(
+    description: str = Field(
         ..., 
-        description="Localized descriptions for notification type. Keys are language codes (e.g., 'en', 'fr')."
+        description="Description in the requested language, falling back to English."
     )
-    available: bool = Field(..., description="Is this notification type currently available?")
     deprecated: bool = Field(..., description="Is this notification type deprecated?")
     deprecated_reason: Optional[str] = Field(
         None, 
-        description="Reason for deprecation (if deprecated)."
+        description="Reason for deprecation (only present if deprecated)."
     )
-
-class NotificationTypeOut(NotificationTypeBase):
-    """
-    Output schema for NotificationType (API response).
-    """
-    id: int = Field(..., description="Unique identifier for notification type.")
     created_at: Optional[datetime] = Field(
         None, 
         description="Creation timestamp (ISO 8601)."
@@ -32,14 +27,11 @@ class NotificationTypeOut(NotificationTypeBase):
         description="Last update timestamp (ISO 8601)."
     )
 
-    class Config:
-        orm_mode = True
-
 class NotificationTypeListResponse(BaseModel):
     """
     Response schema for list of notification types.
     """
-    notification_types: List[NotificationTypeOut] = Field(
+    notification_types: List[NotificationTypeOutActive] = Field(
         ..., 
         description="List of notification types and their descriptions."
     )
@@ -54,4 +46,4 @@ class ErrorResponse(BaseModel):
         description="Optional list of error details."
     )
 
-# Exported: NotificationTypeBase, NotificationTypeOut, NotificationTypeListResponse, ErrorResponse
\ No newline at end of file
+# Exported: NotificationTypeOutActive, NotificationTypeListResponse, ErrorResponse
\ No newline at end of file
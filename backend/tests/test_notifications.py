@@ -1,16 +1,38 @@
+import asyncio
+import hashlib
+import logging
+import time
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from backend.main import app
+from backend.main import app, resolve_log_level
 from backend.models import Base, NotificationType
-from backend.middleware.auth import JWT_SECRET, JWT_ALGORITHM
+from backend.routes.dependencies import get_db, get_many_by_keys
+from backend.routes.notifications import invalidate_notification_types_cache, _LIST_CACHE, _LIST_CACHE_MAXSIZE
+from backend.middleware import auth as auth_middleware
+from backend.middleware.auth import JWT_SECRET, JWT_ALGORITHM, decode_token, _jwt_cache
 import jwt
 
-# Setup test database (SQLite in-memory for speed)
+# Setup test database (SQLite in-memory for speed).
+# StaticPool shares one connection, so every session (and TestClient thread) sees the same DB.
 TEST_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Durability is irrelevant for tests; skip journaling and fsync
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Override get_db dependency for tests
@@ -21,16 +43,16 @@ def override_get_db():
     finally:
         db.close()
 
-app.dependency_overrides = getattr(app, "dependency_overrides", {})
-app.dependency_overrides["backend.routes.dependencies.get_db"] = override_get_db
+# dependency_overrides is keyed by the dependency callable itself
+app.dependency_overrides[get_db] = override_get_db
 
 client = TestClient(app)
 
-def create_jwt_token(user_id: int = 1, username: str = "testuser") -> str:
+def create_jwt_token(user_id: int = 1, username: str = "testuser", exp: int = 9999999999) -> str:
     payload = {
         "sub": str(user_id),
         "username": username,
-        "exp": 9999999999  # Far future for test
+        "exp": exp  # Far future by default
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
@@ -40,33 +62,37 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     # Insert test notification types
     db = TestingSessionLocal()
-    db.add_all([
-        NotificationType(
-            key="email_alert",
-            descriptions={"en": "Email alerts", "fr": "Alertes par email"},
-            available=True,
-            deprecated=False
-        ),
-        NotificationType(
-            key="sms_alert",
-            descriptions={"en": "SMS alerts", "fr": "Alertes SMS"},
-            available=True,
-            deprecated=True,
-            deprecated_reason="Replaced by push notifications"
-        ),
-        NotificationType(
-            key="push_alert",
-            descriptions={"en": "Push notifications", "fr": "Notifications push"},
-            available=True,
-            deprecated=False
-        ),
-        NotificationType(
-            key="legacy_alert",
-            descriptions={"en": "Legacy alerts", "fr": "Alertes héritées"},
-            available=False,
-            deprecated=True,
-            deprecated_reason="Deprecated and unavailable"
-        ),
+    # Bulk insert skips per-object ORM state; timestamps come from server defaults
+    db.bulk_insert_mappings(NotificationType, [
+        {
+            "key": "email_alert",
+            "descriptions": {"en": "Email alerts", "fr": "Alertes par email"},
+            "available": True,
+            "deprecated": False,
+            "deprecated_reason": None,
+        },
+        {
+            "key": "sms_alert",
+            "descriptions": {"en": "SMS alerts", "fr": "Alertes SMS"},
+            "available": True,
+            "deprecated": True,
+            "deprecated_reason": "Replaced by push notifications",
+        },
+        {
+            "key": "push_alert",
+            # Empty German value exercises the fallback to English
+            "descriptions": {"en": "Push notifications", "fr": "Notifications push", "de": ""},
+            "available": True,
+            "deprecated": False,
+            "deprecated_reason": None,
+        },
+        {
+            "key": "legacy_alert",
+            "descriptions": {"en": "Legacy alerts", "fr": "Alertes héritées"},
+            "available": False,
+            "deprecated": True,
+            "deprecated_reason": "Deprecated and unavailable",
+        },
     ])
     db.commit()
     db.close()
@@ -78,6 +104,19 @@ def test_unauthenticated_access_denied():
     response = client.get("/api/notifications/")
     assert response.status_code == 401
     assert "Authentication required" in response.json()["detail"]
+    # Same compact orjson encoding as every other response
+    assert response.content == b'{"detail":"Authentication required. Please log in."}'
+
+def test_bearer_scheme_is_case_insensitive():
+    token = create_jwt_token()
+    response = client.get("/api/notifications/", headers={"Authorization": f"bearer {token}"})
+    assert response.status_code == 200
+
+@pytest.mark.parametrize("auth_header", ["Basic dXNlcjpwYXNz", "Bearer", "Bearer "])
+def test_non_bearer_or_empty_token_denied(auth_header):
+    response = client.get("/api/notifications/", headers={"Authorization": auth_header})
+    assert response.status_code == 401
+    assert "Authentication required" in response.json()["detail"]
 
 def test_authenticated_access_success():
     token = create_jwt_token()
@@ -90,6 +129,16 @@ def test_authenticated_access_success():
     keys = [nt["key"] for nt in data["notification_types"]]
     assert "legacy_alert" not in keys
     assert set(keys) == {"email_alert", "sms_alert", "push_alert"}
+    # `available` is implied by the filter and not sent
+    for nt in data["notification_types"]:
+        assert "available" not in nt
+
+def test_no_trailing_slash_not_redirected():
+    token = create_jwt_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/api/notifications", headers=headers, follow_redirects=False)
+    assert response.status_code == 200
+    assert len(response.json()["notification_types"]) == 3
 
 def test_deprecated_type_marked():
     token = create_jwt_token()
@@ -100,28 +149,171 @@ def test_deprecated_type_marked():
     assert sms_alert is not None
     assert sms_alert["deprecated"] is True
     assert sms_alert["deprecated_reason"] == "Replaced by push notifications"
+    # Non-deprecated types omit deprecated_reason entirely
+    email_alert = next(nt for nt in data["notification_types"] if nt["key"] == "email_alert")
+    assert email_alert["deprecated"] is False
+    assert "deprecated_reason" not in email_alert
 
 def test_localization_descriptions():
     token = create_jwt_token()
     headers = {"Authorization": f"Bearer {token}"}
     response = client.get("/api/notifications/?lang=fr", headers=headers)
     data = response.json()
-    for nt in data["notification_types"]:
-        assert "fr" in nt["descriptions"]
-        assert isinstance(nt["descriptions"]["fr"], str)
+    descriptions = {nt["key"]: nt["description"] for nt in data["notification_types"]}
+    assert descriptions["email_alert"] == "Alertes par email"
+    assert descriptions["push_alert"] == "Notifications push"
+
+def test_localization_english():
+    token = create_jwt_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/api/notifications/?lang=en", headers=headers)
+    data = response.json()
+    descriptions = {nt["key"]: nt["description"] for nt in data["notification_types"]}
+    assert descriptions == {
+        "email_alert": "Email alerts",
+        "sms_alert": "SMS alerts",
+        "push_alert": "Push notifications",
+    }
+
+def test_localization_falls_back_to_english():
+    token = create_jwt_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/api/notifications/?lang=de", headers=headers)
+    data = response.json()
+    descriptions = {nt["key"]: nt["description"] for nt in data["notification_types"]}
+    # Missing locale falls back to English
+    assert descriptions["email_alert"] == "Email alerts"
+    # Empty-string locale value also falls back to English
+    assert descriptions["push_alert"] == "Push notifications"
+
+# Simulate DB error: sessions bound to an unreachable database fail on first query
+broken_engine = create_engine("sqlite:////nonexistent/dir/notifications.db")
+
+def broken_get_db():
+    db = sessionmaker(bind=broken_engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("descriptions, lang, expected", [
+    ({"en": "Email alerts", "fr": "Alertes par email"}, "en", "Email alerts"),
+    ({"en": "Email alerts", "fr": "Alertes par email"}, "fr", "Alertes par email"),
+    ({"en": "Email alerts"}, "de", "Email alerts"),
+    ({"en": "Email alerts", "de": ""}, "de", "Email alerts"),
+    ({"fr": "Alertes par email"}, "en", ""),
+    ({}, "fr", ""),
+    (None, "en", ""),
+])
+def test_get_description_fallback(descriptions, lang, expected):
+    assert NotificationType(descriptions=descriptions).get_description(lang) == expected
 
 def test_error_handling_db_failure(monkeypatch):
-    # Simulate DB error
-    def broken_get_db():
-        raise Exception("DB connection failed")
-    app.dependency_overrides["backend.routes.dependencies.get_db"] = broken_get_db
+    app.dependency_overrides[get_db] = broken_get_db
+    # Bypass the cached list response so the DB is actually hit
+    invalidate_notification_types_cache()
     token = create_jwt_token()
     headers = {"Authorization": f"Bearer {token}"}
     response = client.get("/api/notifications/", headers=headers)
     assert response.status_code == 500
     assert "Failed to fetch notification types" in response.json()["detail"]
     # Restore dependency
-    app.dependency_overrides["backend.routes.dependencies.get_db"] = override_get_db
+    app.dependency_overrides[get_db] = override_get_db
+
+@pytest.fixture
+def clear_jwt_cache():
+    _jwt_cache.clear()
+    yield
+    _jwt_cache.clear()
+
+def test_list_cache_serves_without_db_and_invalidates():
+    token = create_jwt_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    invalidate_notification_types_cache()
+    response = client.get("/api/notifications/", headers=headers)
+    assert response.status_code == 200
+    app.dependency_overrides[get_db] = broken_get_db
+    try:
+        # Cached body is served even though the DB is unreachable
+        cached = client.get("/api/notifications/", headers=headers)
+        assert cached.status_code == 200
+        assert cached.content == response.content
+        # After invalidation the DB is hit again
+        invalidate_notification_types_cache()
+        assert len(_LIST_CACHE) == 0
+        response = client.get("/api/notifications/", headers=headers)
+        assert response.status_code == 500
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+        invalidate_notification_types_cache()
+
+def test_list_cache_is_bounded():
+    token = create_jwt_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    invalidate_notification_types_cache()
+    for i in range(_LIST_CACHE_MAXSIZE + 10):
+        response = client.get(f"/api/notifications/?lang=x{i:03d}", headers=headers)
+        assert response.status_code == 200
+    assert len(_LIST_CACHE) <= _LIST_CACHE_MAXSIZE
+    invalidate_notification_types_cache()
+
+def test_jwt_cache_reuses_verified_payload(monkeypatch, clear_jwt_cache):
+    token = create_jwt_token(user_id=42)
+    payload = asyncio.run(decode_token(token))
+    # A cache hit must not re-verify the signature
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("jwt.decode called on cache hit")
+    monkeypatch.setattr(jwt, "decode", fail_decode)
+    assert asyncio.run(decode_token(token)) == payload
+
+def test_jwt_cache_does_not_serve_expired_token(clear_jwt_cache):
+    # Seed the cache directly with an already-expired payload, as if it expired while cached
+    payload = {"sub": "43", "username": "testuser", "exp": int(time.time()) - 10}
+    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    key = hashlib.sha256(token.encode()).digest()
+    _jwt_cache[key] = payload
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/api/notifications/", headers=headers)
+    assert response.status_code == 401
+    assert "Session expired" in response.json()["detail"]
+    assert key not in _jwt_cache
+
+def test_jwt_cache_skips_invalid_token(clear_jwt_cache):
+    token = jwt.encode({"sub": "44", "exp": 9999999999}, "wrong_secret", algorithm=JWT_ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/api/notifications/", headers=headers)
+    assert response.status_code == 401
+    assert len(_jwt_cache) == 0
+
+def test_auth_failure_summary_flushed_after_interval(monkeypatch, caplog):
+    monkeypatch.setattr(auth_middleware, "_auth_failures", auth_middleware.Counter())
+    # Last summary was long ago, so a single failure triggers one
+    monkeypatch.setattr(
+        auth_middleware,
+        "_last_auth_failure_summary",
+        time.monotonic() - auth_middleware.AUTH_FAILURE_LOG_INTERVAL
+    )
+    with caplog.at_level("WARNING", logger="notification_preferences_api.auth"):
+        response = client.get("/api/notifications/")
+    assert response.status_code == 401
+    assert "1 authentication failures: missing=1" in caplog.text
+    assert auth_middleware._auth_failures.total() == 0
+
+def test_get_many_by_keys():
+    db = TestingSessionLocal()
+    try:
+        rows = get_many_by_keys(db, NotificationType, ["email_alert", "legacy_alert", "unknown"])
+        assert {nt.key for nt in rows} == {"email_alert", "legacy_alert"}
+        # Any iterable works, including an empty one
+        assert get_many_by_keys(db, NotificationType, iter(())) == []
+    finally:
+        db.close()
+
+def test_resolve_log_level():
+    assert resolve_log_level("debug") == logging.DEBUG
+    assert resolve_log_level("WARNING") == logging.WARNING
+    # Typos fall back to WARNING instead of failing at import
+    assert resolve_log_level("warn ing") == logging.WARNING
 
 def test_health_check_endpoint():
     response = client.get("/health")
@@ -6,8 +6,7 @@ import { getAuthToken } from '../utils/auth';
 interface NotificationType {
   id: number;
   key: string;
-  descriptions: Record<string, string>;
-  available: boolean;
+  description: string;
   deprecated: boolean;
   deprecated_reason?: string | null;
   created_at?: string;
@@ -156,7 +155,6 @@ const NotificationPreferences: React.FC = () => {
               <NotificationTypeCard
                 key={type.id}
                 notificationType={type}
-                language={i18n.language}
               />
             ))
           )}
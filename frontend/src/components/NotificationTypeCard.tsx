@@ -4,8 +4,7 @@ import { useTranslation } from 'react-i18next';
 interface NotificationType {
   id: number;
   key: string;
-  descriptions: Record<string, string>;
-  available: boolean;
+  description: string;
   deprecated: boolean;
   deprecated_reason?: string | null;
   created_at?: string;
@@ -14,7 +13,6 @@ interface NotificationType {
 
 interface NotificationTypeCardProps {
   notificationType: NotificationType;
-  language: string;
 }
 
 /**
@@ -24,15 +22,11 @@ interface NotificationTypeCardProps {
  */
 const NotificationTypeCard: React.FC<NotificationTypeCardProps> = ({
   notificationType,
-  language,
 }) => {
   const { t } = useTranslation();
 
-  // Get localized description, fallback to English
-  const description =
-    notificationType.descriptions[language] ||
-    notificationType.descriptions['en'] ||
-    t('noDescription');
+  // Description is localized (with English fallback) by the API
+  const description = notificationType.description || t('noDescription');
 
   // Accessibility: tooltip for deprecated reason
   const deprecatedTooltipId = `deprecated-tooltip-${notificationType.id}`;